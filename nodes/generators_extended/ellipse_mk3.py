@@ -20,10 +20,13 @@ import bpy
 from bpy.props import BoolProperty, IntProperty, FloatProperty, EnumProperty
 
 from sverchok.node_tree import SverchCustomTreeNode
-from sverchok.data_structure import (match_long_repeat, updateNode, get_edge_loop)
+from sverchok.data_structure import (match_long_repeat, updateNode, get_edge_loop, numpy_full_list)
 from sverchok.utils.sv_transform_helper import AngleUnits, SvAngleHelper
+from sverchok.utils.ellipse_kernel import ellipse_verts
+from sverchok.dependencies import numba
 
 from math import sin, cos, pi, sqrt
+from functools import lru_cache
 import numpy as np
 
 centering_items = [("F1", "F1", "Ellipse focal point 1", 1),
@@ -34,10 +37,25 @@ mode_items = [("AB", "a b", "Major Radius / Minor Radius", 1),
               ("AE", "a e", "Major Radius / Eccentricity", 2),
               ("AC", "a c", "Major Radius / Focal Length", 3)]
 
+epsilon = 1e-10  # used to eliminate division by zero
 
-def sign(x): return 1 if x > 0 else -1 if x < 0 else 0
+kernel_min_verts = 10000  # total number of vertices (B * N) above which the compiled kernel is used
 
-epsilon = 1e-10  # used to eliminate division by zero
+output_names = ("Verts", "Edges", "Polys", "F1", "F2")
+
+
+def is_plain_ellipse(exx, eyy):
+    ''' True when ex = ey = 2 (exx = eyy = 1), i.e. the superellipse powers are no-ops '''
+    # exx & eyy are off by ~epsilon from 1 for ex = ey = 2
+    return (abs(exx - 1.0) < 1e-9) & (abs(eyy - 1.0) < 1e-9)
+
+
+@lru_cache(maxsize=64)
+def _edges_polys(N):
+    ''' Edges and polys of an N vertices ellipse (shared by all ellipses with the same N) '''
+    edges = get_edge_loop(N)
+    polys = [list(range(N))]
+    return edges, polys
 
 # name : [ major radius, minor radius, x exponent, y exponent, num verts ]
 super_presets = {
@@ -202,6 +220,11 @@ class SvEllipseNodeMK3(SverchCustomTreeNode, bpy.types.Node, SvAngleHelper):
         name='Exponent Y', description='Exponent Y to modulate the ellipse along Y direction',
         default=2.0, min=0.0, update=updateNode)
 
+    output_numpy: BoolProperty(
+        name='Output NumPy',
+        description='Output NumPy arrays',
+        default=False, update=updateNode)
+
     updating: BoolProperty(default=False)  # used for disabling update callback
 
     def migrate_from(self, old_node):
@@ -243,6 +266,10 @@ class SvEllipseNodeMK3(SverchCustomTreeNode, bpy.types.Node, SvAngleHelper):
 
     def draw_buttons_ext(self, context, layout):
         self.draw_angle_units_buttons(context, layout)
+        layout.prop(self, "output_numpy")
+
+    def rclick_menu(self, context, layout):
+        layout.prop(self, "output_numpy", toggle=True)
 
     def update_sockets(self):
         if self.mode == "AB":
@@ -255,7 +282,7 @@ class SvEllipseNodeMK3(SverchCustomTreeNode, bpy.types.Node, SvAngleHelper):
             socket2 = self.inputs[1]
             socket2.replace_socket("SvStringsSocket", "Focal Length").prop_name = "focal_length"
 
-    def make_ellipse(self, a, b, N, phase, rotation, scale, ex, ey):
+    def make_ellipse(self, a, b, N, phase, rotation, scale, ex, ey, want=None):
         '''
         Make an Ellipse (verts, edges and polys)
 
@@ -267,20 +294,43 @@ class SvEllipseNodeMK3(SverchCustomTreeNode, bpy.types.Node, SvAngleHelper):
         scale     : scale the major & minor radii by this factor
         ex        : exponent x (modulates the ellipse along x direction)
         ey        : exponent y (modulates the ellipse along y direction)
+        want      : names of the outputs to compute (all if None), the others are returned as None
+
+        NOTE: this is make_ellipses applied to a batch of one ellipse.
+        '''
+        if want is None:
+            want = output_names
+
+        parameters = [np.array([value], dtype=np.float64) for value in (a, b, phase, rotation, scale, ex, ey)]
+        a, b, phase, rotation, scale, ex, ey = parameters
+        verts, f1, f2 = self.make_ellipses(a, b, N, phase, rotation, scale, ex, ey, want)
+        verts = None if verts is None else verts[0]
+        f1 = None if f1 is None else f1[0]
+        f2 = None if f2 is None else f2[0]
+
+        edges = polys = None
+        if "Edges" in want or "Polys" in want:
+            edges, polys = _edges_polys(N)
+
+        return verts, edges, polys, f1, f2
+
+    def make_ellipses(self, a, b, N, phase, rotation, scale, ex, ey, want=None):
         '''
-        verts = []
-        edges = []
-        polys = []
+        Make a batch of Ellipses sharing the same number of vertices (verts, F1 and F2)
+
+        Same parameters as make_ellipse, except that all of them (but N) are
+        arrays of length B, one value per ellipse, so that all the ellipses
+        are computed at once as arrays of shape (B, N).
+        '''
+        if want is None:
+            want = output_names
 
         a = a * scale
         b = b * scale
 
-        if a > b:
-            dx = sqrt(a * a - b * b)
-            dy = 0
-        else:
-            dx = 0
-            dy = sqrt(b * b - a * a)
+        d = np.sqrt(np.abs(a * a - b * b))
+        dx = d * (a > b)  # the focal points are along the major axis
+        dy = d - dx
 
         if self.centering == "F1":
             cx = -dx
@@ -289,54 +339,70 @@ class SvEllipseNodeMK3(SverchCustomTreeNode, bpy.types.Node, SvAngleHelper):
             cx = +dx
             cy = +dy
         else:  # "C"
-            cx = 0
-            cy = 0
-
-        sins = sin(rotation)  # cached for performance
-        coss = cos(rotation)  # cached for performance
-
-        # locations of the focal points of the centered and rotated ellipse
-        f1x = -cx - dx
-        f1y = -cy - dy
-        f2x = -cx + dx
-        f2y = -cy + dy
-        f1xx = f1x * coss - f1y * sins
-        f1yy = f1x * sins + f1y * coss
-        f2xx = f2x * coss - f2y * sins
-        f2yy = f2x * sins + f2y * coss
-
-        f1 = [f1xx, f1yy, 0]
-        f2 = [f2xx, f2yy, 0]
-
-        delta = 2 * pi / N  # angle increment (cached for performance)
-
-        exx = 2.0 / (ex + epsilon)
-        eyy = 2.0 / (ey + epsilon)
-
-        _arr_indexes = np.arange(N, dtype=np.int32)
-        _theta = _arr_indexes * delta + phase
-        _cos_theta = np.cos(_theta)
-        _sin_theta = np.sin(_theta)
-        _x = -cx + a*np.power(np.abs(_cos_theta), exx) * np.where(_cos_theta>=0, 1, -1)
-        _y = -cy + b*np.power(np.abs(_sin_theta), eyy) * np.where(_sin_theta>=0, 1, -1)
-        # apply in-plane rotation
-        xx = _x*coss - _y*sins
-        yy = _x*sins + _y*coss
-        
-        _verts = np.column_stack((xx, yy))
-        _verts = np.insert(_verts, 2, [0], axis=1)
-        list_verts = _verts.tolist()
-
-        edges = get_edge_loop(N)
-        _arr_indexes = np.arange(N, dtype=np.int32)
-        polys = [_arr_indexes.tolist()]
-        
-        return list_verts, edges, polys, f1, f2
+            cx = cy = 0.0
+
+        sins = np.sin(rotation)  # cached for performance
+        coss = np.cos(rotation)  # cached for performance
+
+        # locations of the focal points of the centered and rotated ellipses
+        f1_list = f2_list = None
+        if "F1" in want or "F2" in want:
+            # rotated offset of the focal points from the ellipse center
+            fx = dx * coss - dy * sins
+            fy = dx * sins + dy * coss
+            # F1 and F2 are at -f and +f from the center, which is at (0, +f, -f) for centering (C, F1, F2)
+            k1, k2 = {"C": (-1, 1), "F1": (0, 2), "F2": (-2, 0)}[self.centering]
+            if "F1" in want:
+                f1_list = np.zeros((len(a), 3))
+                f1_list[:, 0] = k1 * fx
+                f1_list[:, 1] = k1 * fy
+            if "F2" in want:
+                f2_list = np.zeros((len(a), 3))
+                f2_list[:, 0] = k2 * fx
+                f2_list[:, 1] = k2 * fy
+
+        verts_list = None
+        if "Verts" in want:
+            delta = 2 * pi / N  # angle increment (cached for performance)
+
+            exx = 2.0 / (ex + epsilon)
+            eyy = 2.0 / (ey + epsilon)
+
+            plain = is_plain_ellipse(exx, eyy)
+
+            if numba and len(a) * N >= kernel_min_verts:
+                # fused compiled loop, avoids the intermediate arrays of the numpy path
+                if self.centering == "C":
+                    cx = cy = np.zeros_like(a)
+                verts = ellipse_verts(N, a, b, cx, cy, exx, eyy, plain, coss, sins, phase, delta)
+            else:
+                # angles are laid out as (N, B) so that the per ellipse values broadcast as they are
+                theta = phase + delta * np.arange(N, dtype=np.float64)[:, None]
+                cos_theta = np.cos(theta)
+                sin_theta = np.sin(theta)
+                if plain.all():
+                    x = a * cos_theta
+                    y = b * sin_theta
+                else:
+                    x = a * np.copysign(np.abs(cos_theta) ** exx, cos_theta)
+                    y = b * np.copysign(np.abs(sin_theta) ** eyy, sin_theta)
+                if self.centering != "C":
+                    x -= cx
+                    y -= cy
+                # apply in-plane rotation
+                verts = np.zeros((len(a), N, 3), dtype=np.float64)
+                verts[:, :, 0] = (x * coss - y * sins).T
+                verts[:, :, 1] = (x * sins + y * coss).T
+            verts_list = list(verts)
+
+        return verts_list, f1_list, f2_list
 
     def process(self):
         outputs = self.outputs
+        # only compute the outputs which are connected
+        want = {socket.name for socket in outputs if socket.is_linked}
         # return if no outputs are connected
-        if not any(s.is_linked for s in outputs):
+        if not want:
             return
 
         # input values lists (single or multi value)
@@ -350,54 +416,92 @@ class SvEllipseNodeMK3(SverchCustomTreeNode, bpy.types.Node, SvAngleHelper):
         input_ex = inputs["Exponent X"].sv_get()[0]
         input_ey = inputs["Exponent Y"].sv_get()[0]
 
+        # any empty input means there are no ellipses to make
+        if not all(len(values) for values in (input_v1, input_v2, input_N, input_p,
+                                               input_r, input_s, input_ex, input_ey)):
+            for name in ("Verts", "Edges", "Polys"):
+                if name in want:
+                    outputs[name].sv_set([])
+            for name in ("F1", "F2"):
+                if name in want:
+                    outputs[name].sv_set([[]])
+            return
+
         # convert main input parameters to major/minor radii (and sanitize inputs)
+        input_v1, input_v2 = [np.asarray(values, dtype=np.float64)
+                              for values in match_long_repeat([input_v1, input_v2])]
+        # (np.maximum/np.minimum rather than np.clip, which is much slower on short arrays)
+        input_a = np.maximum(input_v1, 0.0)
         if self.mode == "AB":
-            input_a, input_b = match_long_repeat([input_v1, input_v2])
-            input_a = list(map(lambda a: max(0.0, a), input_a))
-            input_b = list(map(lambda a, b: max(0.0, min(a, b)), input_a, input_b))
+            input_b = np.maximum(np.minimum(input_a, input_v2), 0.0)
         elif self.mode == "AE":
-            input_a, input_e = match_long_repeat([input_v1, input_v2])
-            input_a = list(map(lambda a: max(0.0, a), input_a))
-            input_e = list(map(lambda e: max(0.0, min(1.0, e)), input_e))
-            input_b = list(map(lambda a, e: a * sqrt(1 - e * e), input_a, input_e))
+            input_e = np.minimum(np.maximum(input_v2, 0.0), 1.0)
+            input_b = input_a * np.sqrt(1 - input_e * input_e)
         else:  # "AC"
-            input_a, input_c = match_long_repeat([input_v1, input_v2])
-            input_a = list(map(lambda a: max(0.0, a), input_a))
-            input_c = list(map(lambda a, c: max(0.0, min(a, c)), input_a, input_c))
-            input_b = list(map(lambda a, c: sqrt(a * a - c * c), input_a, input_c))
+            input_c = np.maximum(np.minimum(input_a, input_v2), 0.0)
+            input_b = np.sqrt(input_a * input_a - input_c * input_c)
 
         # sanitize more inputs
-        input_N = list(map(lambda n: max(3, int(n)), input_N))
-        input_s = list(map(lambda s: max(0.0, s), input_s))
-        input_ex = list(map(lambda e: max(0.0, e), input_ex))
-        input_ey = list(map(lambda e: max(0.0, e), input_ey))
-
-        parameters = match_long_repeat([input_a, input_b, input_N,
-                                        input_p, input_r, input_s,
-                                        input_ex, input_ey])
+        input_N = np.maximum(np.asarray(input_N).astype(np.int64), 3)
+        input_p = np.asarray(input_p, dtype=np.float64)
+        input_r = np.asarray(input_r, dtype=np.float64)
+        input_s = np.maximum(np.asarray(input_s, dtype=np.float64), 0.0)
+        input_ex = np.maximum(np.asarray(input_ex, dtype=np.float64), 0.0)
+        input_ey = np.maximum(np.asarray(input_ey, dtype=np.float64), 0.0)
+
+        parameters = [input_a, input_b, input_N, input_p, input_r, input_s, input_ex, input_ey]
+        num_ellipses = max(map(len, parameters))
+        a, b, N, p, r, s, ex, ey = [values if len(values) == num_ellipses else numpy_full_list(values, num_ellipses)
+                                    for values in parameters]
 
         # conversion factor from the current angle units to radians
         au = self.radians_conversion_factor()
-
-        verts_list = []
-        edges_list = []
-        polys_list = []
-        f1_list = []
-        f2_list = []
-        for a, b, N, p, r, s, ex, ey in zip(*parameters):
-            verts, edges, polys, f1, f2 = self.make_ellipse(a, b, N, p * au, r * au, s, ex, ey)
-            verts_list.append(verts)
-            edges_list.append(edges)
-            polys_list.append(polys)
-            f1_list.append(f1)
-            f2_list.append(f2)
-
-        outputs["Verts"].sv_set(verts_list)
-        outputs["Edges"].sv_set(edges_list)
-        outputs["Polys"].sv_set(polys_list)
-
-        outputs["F1"].sv_set([f1_list])
-        outputs["F2"].sv_set([f2_list])
+        p = p * au
+        r = r * au
+
+        if (N == N[0]).all():
+            # all ellipses have the same number of vertices: compute them at once
+            N = int(N[0])
+            verts_list, f1_list, f2_list = self.make_ellipses(a, b, N, p, r, s, ex, ey, want)
+            if "Edges" in want or "Polys" in want:
+                edges, polys = _edges_polys(N)
+                edges_list = [edges] * num_ellipses
+                polys_list = [polys] * num_ellipses
+        else:
+            verts_list = [None] * num_ellipses
+            edges_list = [None] * num_ellipses
+            polys_list = [None] * num_ellipses
+            f1_list = [None] * num_ellipses
+            f2_list = [None] * num_ellipses
+            make_ellipse = self.make_ellipse  # cached for performance
+            for i, ellipse_parameters in enumerate(zip(a, b, N.tolist(), p, r, s, ex, ey)):
+                verts, edges, polys, f1, f2 = make_ellipse(*ellipse_parameters, want=want)
+                verts_list[i] = verts
+                edges_list[i] = edges
+                polys_list[i] = polys
+                f1_list[i] = f1
+                f2_list[i] = f2
+
+        if "Verts" in want:
+            if not self.output_numpy:
+                verts_list = [verts.tolist() for verts in verts_list]
+            outputs["Verts"].sv_set(verts_list)
+        if "Edges" in want:
+            outputs["Edges"].sv_set(edges_list)
+        if "Polys" in want:
+            outputs["Polys"].sv_set(polys_list)
+        if "F1" in want:
+            if self.output_numpy:
+                f1_list = np.asarray(f1_list)  # (B, 3) array on both code paths
+            else:
+                f1_list = [f1.tolist() for f1 in f1_list]
+            outputs["F1"].sv_set([f1_list])
+        if "F2" in want:
+            if self.output_numpy:
+                f2_list = np.asarray(f2_list)  # (B, 3) array on both code paths
+            else:
+                f2_list = [f2.tolist() for f2 in f2_list]
+            outputs["F2"].sv_set([f2_list])
 
 
 def register():
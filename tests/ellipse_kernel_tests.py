@@ -0,0 +1,45 @@
+import numpy as np
+from numpy.testing import assert_allclose
+
+from sverchok.utils.testing import SverchokTestCase
+from sverchok.utils.ellipse_kernel import ellipse_verts
+
+
+def numpy_ellipse_verts(N, a, b, cx, cy, exx, eyy, coss, sins, phase, delta):
+    # reference: the numpy formula of the Ellipse node, ellipse by ellipse
+    theta = phase[:, None] + delta * np.arange(N)[None, :]
+    cos_theta = np.cos(theta)
+    sin_theta = np.sin(theta)
+    x = -cx[:, None] + a[:, None] * np.copysign(np.abs(cos_theta) ** exx[:, None], cos_theta)
+    y = -cy[:, None] + b[:, None] * np.copysign(np.abs(sin_theta) ** eyy[:, None], sin_theta)
+    verts = np.zeros((len(a), N, 3))
+    verts[:, :, 0] = x * coss[:, None] - y * sins[:, None]
+    verts[:, :, 1] = x * sins[:, None] + y * coss[:, None]
+    return verts
+
+
+class EllipseKernelTests(SverchokTestCase):
+    def check(self, N, a, b, cx, cy, exx, eyy, plain, rotation, phase):
+        a, b, cx, cy, exx, eyy, rotation, phase = [np.array(values, dtype=np.float64)
+                                                   for values in (a, b, cx, cy, exx, eyy, rotation, phase)]
+        plain = np.array(plain, dtype=np.bool_)
+        coss = np.cos(rotation)
+        sins = np.sin(rotation)
+        delta = 2 * np.pi / N
+        verts = ellipse_verts(N, a, b, cx, cy, exx, eyy, plain, coss, sins, phase, delta)
+        expected = numpy_ellipse_verts(N, a, b, cx, cy, exx, eyy, coss, sins, phase, delta)
+        self.assertEqual(verts.shape, (len(a), N, 3))
+        assert_allclose(verts, expected, rtol=1e-9, atol=1e-12)
+
+    def test_plain_ellipse(self):
+        self.check(36, a=[2.0], b=[1.0], cx=[-1.7], cy=[0.0], exx=[1.0], eyy=[1.0],
+                   plain=[True], rotation=[0.3], phase=[0.1])
+
+    def test_superellipse(self):
+        self.check(50, a=[1.0], b=[1.0], cx=[0.0], cy=[0.0], exx=[4.0], eyy=[2.0 / 3.0],
+                   plain=[False], rotation=[1.2], phase=[0.0])
+
+    def test_mixed_plain_flags(self):
+        self.check(24, a=[1.0, 2.0, 3.0], b=[0.5, 2.0, 1.0], cx=[0.0, 0.0, 2.8], cy=[0.0, 0.0, 0.0],
+                   exx=[1.0, 0.5, 1.0], eyy=[1.0, 3.0, 1.0], plain=[True, False, True],
+                   rotation=[0.0, 0.7, -2.0], phase=[0.0, 0.25, 1.0])
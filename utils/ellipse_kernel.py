@@ -0,0 +1,68 @@
+# This file is part of project Sverchok. It's copyrighted by the contributors
+# recorded in the version control history of the file, available from
+# its original location https://github.com/nortikin/sverchok/commit/master
+#
+# SPDX-License-Identifier: GPL3
+# License-Filename: LICENSE
+
+'''
+Compiled kernel generating the vertices of a batch of (super) ellipses.
+
+It is only worth using when numba is available: without it the kernel falls
+back to a plain python loop, and callers should prefer the numpy code path.
+With numba it pays off for large batches only, for a few hundred vertices
+the numpy code path is as fast or faster.
+'''
+
+from math import sin, cos, copysign
+
+import numpy as np
+
+# njit is a light-wrapper around numba.njit, if found
+from sverchok.dependencies import numba
+from sverchok.utils.decorators_compilation import njit
+
+prange = numba.prange if numba else range
+
+
+@njit(fastmath=True, parallel=True, cache=True)
+def _ellipse_kernel(N, a, b, cx, cy, exx, eyy, plain, coss, sins, phase, delta, out):
+    # one flat loop over all the vertices of all the ellipses,
+    # so that it is parallelized for a single ellipse as well
+    for k in prange(len(a) * N):
+        i = k // N
+        n = k % N
+        theta = n * delta + phase[i]
+        cost = cos(theta)
+        sint = sin(theta)
+        if plain[i]:
+            x = -cx[i] + a[i] * cost
+            y = -cy[i] + b[i] * sint
+        else:
+            x = -cx[i] + a[i] * copysign(abs(cost) ** exx[i], cost)
+            y = -cy[i] + b[i] * copysign(abs(sint) ** eyy[i], sint)
+        # apply in-plane rotation
+        out[i, n, 0] = x * coss[i] - y * sins[i]
+        out[i, n, 1] = x * sins[i] + y * coss[i]
+        out[i, n, 2] = 0.0
+
+
+def ellipse_verts(N, a, b, cx, cy, exx, eyy, plain, coss, sins, phase, delta):
+    '''
+    Vertices of B (super) ellipses as an array of shape (B, N, 3)
+
+    All parameters but N and delta are arrays of length B (one value per ellipse),
+    no broadcasting of scalars is done here.
+
+    N          : number of vertices of each ellipse
+    a, b       : (scaled) major & minor radii
+    cx, cy     : center offset of the ellipses
+    exx, eyy   : 2 / exponent x & 2 / exponent y
+    plain      : whether the ellipses are plain ones (exx = eyy = 1, no powers needed)
+    coss, sins : cosine & sine of the in-plane rotation angles
+    phase      : angle of the first vertex
+    delta      : angle increment between vertices
+    '''
+    out = np.empty((len(a), N, 3), dtype=np.float64)
+    _ellipse_kernel(N, a, b, cx, cy, exx, eyy, plain, coss, sins, phase, delta, out)
+    return out
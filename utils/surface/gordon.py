@@ -25,19 +25,14 @@ def reparametrize_by_segments(curve, t_values, target_t_values, tolerance=1e-6):
 
     kv = curve.get_knotvector()
 
-    def adjust(t):
-        i = kv.searchsorted(t)
-        if i > 0:
-            smaller = kv[i-1]
-            if (t - smaller) < tolerance:
-                return smaller
-        if i < len(kv):
-            greater = kv[i]
-            if (greater - t) < tolerance:
-                return greater
-        return t
-
-    t_values = [adjust(t) for t in t_values]
+    # snap T values which are close enough to existing knots onto those knots
+    t_values = np.asarray(t_values, dtype=np.float64)
+    idxs = kv.searchsorted(t_values)
+    smaller = kv[np.maximum(idxs-1, 0)]
+    greater = kv[np.minimum(idxs, len(kv)-1)]
+    snap_smaller = (idxs > 0) & ((t_values - smaller) < tolerance)
+    snap_greater = (idxs < len(kv)) & ((greater - t_values) < tolerance)
+    t_values = np.where(snap_smaller, smaller, np.where(snap_greater, greater, t_values))
 
     segments = []
     for t1, t2, tgt_t1, tgt_t2 in zip(t_values, t_values[1:], target_t_values, target_t_values[1:]):
@@ -45,13 +40,14 @@ def reparametrize_by_segments(curve, t_values, target_t_values, tolerance=1e-6):
         if segment is not None:
             segment = segment.reparametrize(0.0, tgt_t2 - tgt_t1)
             segments.append(segment)
-    
-    result = segments[0]
-    for segment in segments[1:]:
-        if segment is not None:
-            result = result.concatenate(segment, remove_knots=False)
-    
-    return result
+
+    # Concatenate segments pairwise rather than one by one,
+    # so that each control point is copied O(log K) times instead of O(K).
+    while len(segments) > 1:
+        pairs = zip(segments[::2], segments[1::2] + [None])
+        segments = [s1 if s2 is None else s1.concatenate(s2, remove_knots=False) for s1, s2 in pairs]
+
+    return segments[0]
     #return remove_excessive_knots(result, tolerance=tolerance)
 
 class GordonUnificationException(ArgumentError):
@@ -97,9 +93,12 @@ def gordon_surface(u_curves, v_curves, intersections,
     if logger is None:
         logger = get_logger()
 
-    intersections = np.array(intersections)
+    # intersections are only read below, so no need to copy them if an array already
+    intersections = np.asarray(intersections, dtype=np.float64)
 
     if u_knots is not None:
+        u_knots = np.asarray(u_knots, dtype=np.float64)
+        v_knots = np.asarray(v_knots, dtype=np.float64)
         avg_u_knots = np.mean(u_knots, axis=0)
         avg_v_knots = np.mean(v_knots, axis=0)
         #loft_u_kwargs = loft_v_kwargs = interpolate_kwargs = {'metric': 'POINTS'}
@@ -193,12 +192,13 @@ def nurbs_blend_surfaces(surface1, surface2, curve1, curve2, bulge1, bulge2, u_d
         c1_binormals = calc1.uv_normals_in_3d
         c2_binormals = calc2.uv_normals_in_3d
 
+    # binormals arrays are owned by calc1 / calc2, which are local to this
+    # function, so they can be scaled in place without temporary arrays
     if absolute_bulge:
-        c1_binormals = bulge1 * c1_binormals / np.linalg.norm(c1_binormals, axis=1, keepdims=True)
-        c2_binormals = bulge2 * c2_binormals / np.linalg.norm(c2_binormals, axis=1, keepdims=True)
-    else:
-        c1_binormals = bulge1 * c1_binormals
-        c2_binormals = bulge2 * c2_binormals
+        c1_binormals /= np.linalg.norm(c1_binormals, axis=1, keepdims=True)
+        c2_binormals /= np.linalg.norm(c2_binormals, axis=1, keepdims=True)
+    c1_binormals *= bulge1
+    c2_binormals *= bulge2
 
     c1_across = calc1.calc_curvatures_across_curve()
     c2_across = calc2.calc_curvatures_across_curve()
@@ -221,7 +221,12 @@ def nurbs_blend_surfaces(surface1, surface2, curve1, curve2, bulge1, bulge2, u_d
     u_curves = [curve1, curve2]
 
     if tangency == TANGENCY_G1:
-        v_curves = [SvBezierCurve.from_control_points([p1, p1+t1, p2+t2, p2]) for p1, t1, p2, t2 in zip(c1_points, c1_binormals, c2_points, c2_binormals)]
+        control_points = np.empty((u_samples, 4, 3))
+        control_points[:,0] = c1_points
+        control_points[:,1] = c1_points + c1_binormals
+        control_points[:,2] = c2_points + c2_binormals
+        control_points[:,3] = c2_points
+        v_curves = [SvBezierCurve.from_control_points(cpts) for cpts in control_points]
     else: # G2
         v_curves = []
         for u1, u2, p1, p2, t1, t2, n1, n2, c1, c2 in zip(ts1, ts2, c1_points, c2_points, c1_binormals, c2_binormals, c1_normals, c2_normals, c1_across, c2_across):
@@ -229,7 +234,7 @@ def nurbs_blend_surfaces(surface1, surface2, curve1, curve2, bulge1, bulge2, u_d
             v_curve = SvBezierCurve.from_tangents_normals_curvatures(p1, p2, t1, -t2, n1, n2, c1, c2)
             v_curves.append(v_curve)
 
-    intersections = np.transpose(np.asarray([c1_points, c2_points]), axes=(1,0,2))
+    intersections = np.stack([c1_points, c2_points], axis=1)
 
     return gordon_surface(u_curves, v_curves, intersections, logger=logger)[-1]
 